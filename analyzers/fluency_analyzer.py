@@ -3,6 +3,8 @@ import logging
 from typing import List, Dict, Any
 from pathlib import Path
 
+import numpy as np
+
 logger = logging.getLogger("FluencyAnalyzer")
 
 class FluencyAnalyzer:
@@ -20,24 +22,29 @@ class FluencyAnalyzer:
         Calculates statistical hesitation before words.
         Returns a list of 'Difficulty Targets' where the student struggled.
         """
-        hesitations = []
+        n = len(words)
+        hesitations: List[Dict[str, Any]] = []
         total_pause_time = 0
-        
-        for i in range(1, len(words)):
-            current = words[i]
-            prev = words[i-1]
-            
-            # AssemblyAI provides 'start' and 'end' in ms
-            gap = current.get("start", 0) - prev.get("end", 0)
-            
-            if gap > self.pause_threshold:
+
+        if n > 1:
+            # AssemblyAI provides 'start' and 'end' in ms. One vectorized
+            # pass over contiguous arrays replaces the per-word Python loop.
+            starts = np.fromiter((w.get("start", 0) for w in words), dtype=np.int64, count=n)
+            ends = np.fromiter((w.get("end", 0) for w in words), dtype=np.int64, count=n)
+            gaps = starts[1:] - ends[:-1]
+
+            struggle_idx = np.nonzero(gaps > self.pause_threshold)[0]
+            total_pause_time = int(gaps[struggle_idx].sum())
+
+            # Only the few struggle points get dict materialization.
+            for i in struggle_idx:
+                current = words[i + 1]
                 hesitations.append({
                     "word": current.get("text"),
-                    "pre_word_gap_ms": gap,
+                    "pre_word_gap_ms": int(gaps[i]),
                     "timestamp_ms": current.get("start"),
                     "speaker": current.get("speaker")
                 })
-                total_pause_time += gap
 
         return {
             "struggle_points": hesitations,
@@ -23,6 +23,15 @@ EXA_API_KEY = "758d3439-a850-4818-9f47-485d8b3d5415" # From exa_slam_search.py
 FIRECRAWL_API_KEY = os.getenv("FIRECRAWL_API_KEY")
 LLM_GATEWAY_URL = "https://llm-gateway.assemblyai.com/v1/chat/completions"
 
+# Bound concurrent gateway requests so a burst of analyses can't stampede
+# the API (and its rate limits). Four in flight keeps latency stable.
+_llm_sem = asyncio.Semaphore(4)
+
+# Ceiling for a single tool result fed back into the agentic loop; raw
+# Exa/Firecrawl bodies can run to hundreds of KB and get re-sent on
+# every remaining iteration.
+_MAX_TOOL_RESULT_CHARS = 8000
+
 # --- TOOLS ---
 
 TOOLS = [
@@ -131,61 +140,71 @@ async def generate_analysis(
                 "temperature": temperature
             }
 
-            async with httpx.AsyncClient(timeout=300.0) as client:
-                response = await client.post(LLM_GATEWAY_URL, json=payload, headers=headers)
-                
-                if response.status_code != 200:
-                    logger.error(f"❌ Gateway Error {response.status_code}: {response.text}")
+            # Hold the semaphore only for the gateway request itself; tool
+            # calls below run outside it so they don't starve other analyses.
+            async with _llm_sem:
+                async with httpx.AsyncClient(timeout=300.0) as client:
+                    response = await client.post(LLM_GATEWAY_URL, json=payload, headers=headers)
+
+            if response.status_code != 200:
+                logger.error(f"❌ Gateway Error {response.status_code}: {response.text}")
+                return None
+
+            data = response.json()
+            choice = data["choices"][0]
+            message = choice["message"]
+
+            # Add assistant message to history
+            messages.append(message)
+
+            # Check for tool calls
+            tool_calls = message.get("tool_calls")
+            if tool_calls:
+                logger.info(f"🧬 Processing {len(tool_calls)} tool calls...")
+                for tool_call in tool_calls:
+                    func = tool_call["function"]
+                    name = func["name"]
+                    args = json.loads(func["arguments"])
+
+                    # Execute tool
+                    result = await handle_tool_call(name, args)
+
+                    # Tool output (raw search/scrape bodies) is the only
+                    # unbounded thing in this history, and every later
+                    # iteration re-sends the whole message list. Cap it
+                    # from the tail so the prompt prefix stays stable.
+                    if len(result) > _MAX_TOOL_RESULT_CHARS:
+                        result = result[:_MAX_TOOL_RESULT_CHARS] + "\n…[tool output truncated]"
+
+                    # Add tool response to history
+                    messages.append({
+                        "role": "tool",
+                        "tool_call_id": tool_call["id"],
+                        "content": result
+                    })
+                continue
+            else:
+                # Final response received
+                content = message.get("content", "")
+                if not content:
+                    logger.warning("⚠️ Received empty final content.")
                     return None
-                    
-                data = response.json()
-                choice = data["choices"][0]
-                message = choice["message"]
-                
-                # Add assistant message to history
-                messages.append(message)
-                
-                # Check for tool calls
-                tool_calls = message.get("tool_calls")
-                if tool_calls:
-                    logger.info(f"🧬 Processing {len(tool_calls)} tool calls...")
-                    for tool_call in tool_calls:
-                        func = tool_call["function"]
-                        name = func["name"]
-                        args = json.loads(func["arguments"])
-                        
-                        # Execute tool
-                        result = await handle_tool_call(name, args)
-                        
-                        # Add tool response to history
-                        messages.append({
-                            "role": "tool",
-                            "tool_call_id": tool_call["id"],
-                            "content": result
-                        })
-                    continue 
-                else:
-                    # Final response received
-                    content = message.get("content", "")
-                    if not content:
-                        logger.warning("⚠️ Received empty final content.")
-                        return None
-                        
-                    # Extract JSON
-                    clean_content = content.strip()
-                    if "```json" in clean_content:
-                        clean_content = clean_content.split("```json")[1].split("```")[0].strip()
-                    elif "```" in clean_content:
-                        clean_content = clean_content.split("```")[1].split("```")[0].strip()
-                    
-                    try:
-                        return json.loads(clean_content)
-                    except json.JSONDecodeError:
-                        import re
-                        match = re.search(r'\{.*\}', clean_content, re.DOTALL)
-                        if match:
-                            return json.loads(match.group())
-                        raise
+
+                # Extract JSON
+                clean_content = content.strip()
+                if "```json" in clean_content:
+                    clean_content = clean_content.split("```json")[1].split("```")[0].strip()
+                elif "```" in clean_content:
+                    clean_content = clean_content.split("```")[1].split("```")[0].strip()
+
+                try:
+                    return json.loads(clean_content)
+                except json.JSONDecodeError:
+                    import re
+                    match = re.search(r'\{.*\}', clean_content, re.DOTALL)
+                    if match:
+                        return json.loads(match.group())
+                    raise
 
         logger.warning(f"⚠️ Reached max iterations ({MAX_ITERATIONS}).")
         return None
@@ -1,8 +1,12 @@
 import logging
+import re
 from collections import Counter
 
 logger = logging.getLogger("NgramAnalyzer")
 
+# Compiled once at import; get_bigrams/get_trigrams run per analysis call.
+_PUNCT_RE = re.compile(r'[^\w\s]')
+
 class NgramAnalyzer:
     """
     Performs N-gram analysis on text.
@@ -40,9 +44,8 @@ class NgramAnalyzer:
         Extracts bigrams (pairs of consecutive words) from text.
         Strips punctuation for accurate matching.
         """
-        import re
         # Strip punctuation and split
-        clean_text = re.sub(r'[^\w\s]', '', text.lower())
+        clean_text = _PUNCT_RE.sub('', text.lower())
         words = clean_text.split()
         bigrams = [(words[i], words[i+1]) for i in range(len(words) - 1)]
         # Log a small sample for debugging
@@ -55,8 +58,7 @@ class NgramAnalyzer:
         Extracts trigrams (triplets of consecutive words) from text.
         Strips punctuation for accurate matching.
         """
-        import re
-        clean_text = re.sub(r'[^\w\s]', '', text.lower())
+        clean_text = _PUNCT_RE.sub('', text.lower())
         words = clean_text.split()
         return [(words[i], words[i+1], words[i+2]) for i in range(len(words) - 2)]
 
@@ -3,6 +3,10 @@ import re
 import json
 from typing import List, Dict, Any, Optional
 
+# Compiled once at import; chunk_transcript may split several transcripts
+# per ingest.
+_SENTENCE_BOUNDARY_RE = re.compile(r'(?<=[.!?])\s+')
+
 def chunk_transcript(file_path_or_text: str, max_chunk_chars: int = 3000, sentence_overlap: int = 2) -> List[str]:
     """
     Splits a transcript into overlapping chunks based on sentence boundaries.
@@ -18,21 +22,21 @@ def chunk_transcript(file_path_or_text: str, max_chunk_chars: int = 3000, senten
                     data = json.load(f)
                     if isinstance(data, dict):
                         if 'sentences' in data: sentences = [s['text'] for s in data['sentences']]
-                        elif 'text' in data: sentences = re.split(r'(?<=[.!?])\s+', data['text'])
+                        elif 'text' in data: sentences = _SENTENCE_BOUNDARY_RE.split(data['text'])
                     elif isinstance(data, list):
                         full_text = " ".join([w.get('text', '') for w in data])
-                        sentences = re.split(r'(?<=[.!?])\s+', full_text)
+                        sentences = _SENTENCE_BOUNDARY_RE.split(full_text)
             except Exception: pass
         else:
             try:
                 with open(file_path_or_text, 'r', encoding='utf-8') as f:
                     text = f.read()
-                sentences = re.split(r'(?<=[.!?])\s+', text)
+                sentences = _SENTENCE_BOUNDARY_RE.split(text)
             except Exception: pass
     
     # If not a path or file read failed, treat as raw text
     if not sentences:
-        sentences = re.split(r'(?<=[.!?])\s+', file_path_or_text)
+        sentences = _SENTENCE_BOUNDARY_RE.split(file_path_or_text)
 
     chunks = []
     current_chunk_sentences = []
@@ -18,6 +18,14 @@ import json
 import re
 from collections import Counter
 from pathlib import Path
+
+# Compiled once at import — the filler scan runs per turn x filler, and
+# re-parsing the pattern (plus the regex-cache lookup) adds up on long
+# transcripts.
+_FILLER_WORDS = ('um', 'uh', 'like', 'you know', 'so', 'well', 'actually')
+_FILLER_PATTERNS = {f: re.compile(r'\b' + f + r'\b') for f in _FILLER_WORDS}
+_SENTENCE_SPLIT_RE = re.compile(r'[.!?]+')
+_FALSE_START_RE = re.compile(r'\b(\w+)\s+\1\b', re.IGNORECASE)
 from typing import cast, Any, Callable, final
 from collections.abc import Mapping, Iterable
 import sys
@@ -518,15 +526,14 @@ class SessionAnalyzer:
         """Count filler words"""
         if turns is None:
             turns = self.student_turns_list
-        fillers = ['um', 'uh', 'like', 'you know', 'so', 'well', 'actually']
         filler_counts: Counter[str] = Counter()
         total_words = 0
         for turn in turns:
             text = cast(str, turn.get('transcript', '')).lower()
             words = cast(list[object], turn.get('words', []))
             total_words += len(words)
-            for filler in fillers:
-                count = len(re.findall(r'\b' + filler + r'\b', text))
+            for filler, pattern in _FILLER_PATTERNS.items():
+                count = len(pattern.findall(text))
                 if count > 0:
                     filler_counts[filler] += count
 
@@ -743,7 +750,7 @@ class SessionAnalyzer:
             # T-unit approximation: Split by sentence boundaries
             # A T-unit = main clause + attached subordinate clauses
             # Approximation: sentences (split by . ! ?)
-            sentences = re.split(r'[.!?]+', all_text)
+            sentences = _SENTENCE_SPLIT_RE.split(all_text)
             sentences = [s.strip() for s in sentences if s.strip()]
             t_units = len(sentences)
             
@@ -765,11 +772,10 @@ class SessionAnalyzer:
             # From existing pause/filler analysis
             total_pauses = sum(len(cast(list[object], cast(dict[str, object], t.get('analysis', {})).get('pauses', []))) for t in turns)
             total_fillers = 0
-            filler_words = ['um', 'uh', 'like', 'you know', 'so', 'well', 'actually']
             for turn in turns:
                 text = cast(str, turn.get('transcript', '')).lower()
-                for filler in filler_words:
-                    total_fillers += len(re.findall(r'\b' + filler + r'\b', text))
+                for pattern in _FILLER_PATTERNS.values():
+                    total_fillers += len(pattern.findall(text))
             
             # Mean Length of Run (words between pauses)
             mlr = round(total_words / (total_pauses + 1), 2) if total_pauses >= 0 else total_words
@@ -782,7 +788,7 @@ class SessionAnalyzer:
             # - Repeated words (false starts)
             # - Very short sentences (fragments)
             
-            false_starts = len(re.findall(r'\b(\w+)\s+\1\b', all_text, re.IGNORECASE))
+            false_starts = len(_FALSE_START_RE.findall(all_text))
             short_tunits = sum(1 for s in sentences if len(s.split()) < 3)
             error_free_approx = t_units - short_tunits - false_starts
             error_free_pct = round((error_free_approx / t_units) * 100, 1) if t_units > 0 else 0
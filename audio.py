@@ -0,0 +1,122 @@
+"""
+Multi-channel capture with mono downmix for interview/aggregator devices.
+
+The device's channel count and the selected channel indices are fixed at
+construction time, so instead of running the fully-general NumPy downmix on
+every chunk, __init__ picks a kernel specialized for the exact
+(n_channels, channel_indices) configuration:
+
+  * mono input          -> zero-copy passthrough
+  * single channel pick -> strided slice copy (no reduction at all)
+  * stereo [0, 1]       -> integer shift-and-add (no float round-trip)
+  * anything else       -> generic fancy-index + mean
+
+This is partial evaluation in spirit: the per-chunk hot path never
+re-inspects the configuration.
+
+The WAV-recording stream used by the live session server lives in main.py;
+this class is capture-only.
+"""
+
+import numpy as np
+import pyaudio
+
+
+class MonoMicrophoneStream:
+    def __init__(self, device_index=7, channel_indices=None, rate=16000, chunk=8000):
+        self.p = pyaudio.PyAudio()
+
+        info = self.p.get_device_info_by_index(device_index)
+        max_channels = int(info.get('maxInputChannels', 0))
+        if max_channels <= 0:
+            self.p.terminate()
+            raise ValueError(f"Device {device_index} ({info.get('name')}) has no input channels")
+
+        self.rate = rate
+        self.chunk = chunk
+        self.input_channels = max_channels
+        self.channel_indices = list(channel_indices) if channel_indices is not None else list(range(max_channels))
+
+        self._kernel = self._select_kernel()
+
+        self.stream = self.p.open(
+            format=pyaudio.paInt16,
+            channels=self.input_channels,
+            rate=self.rate,
+            input=True,
+            input_device_index=device_index,
+            frames_per_buffer=self.chunk
+        )
+        self.active = True
+
+    # --- KERNEL SPECIALIZATION ---
+
+    def _select_kernel(self):
+        n_ch = self.input_channels
+        idx = self.channel_indices
+
+        if n_ch == 1:
+            return self._kernel_passthrough
+
+        if len(idx) == 1:
+            # Bind the constants into the closure so the hot path is a
+            # single strided copy.
+            offset = idx[0]
+
+            def select_one(data):
+                return np.frombuffer(data, dtype=np.int16)[offset::n_ch].tobytes()
+            return select_one
+
+        # Reduction kernels reuse these per-instance buffers every chunk
+        # instead of allocating fresh int32/int16 arrays at 2 Hz for the
+        # lifetime of the stream. PyAudio has no read_into, so the input
+        # bytes are unavoidable; np.frombuffer at least views them
+        # zero-copy, and everything after lands in preallocated memory.
+        acc = np.empty(self.chunk, dtype=np.int32)
+        out = np.empty(self.chunk, dtype=np.int16)
+
+        if n_ch == 2 and idx == [0, 1]:
+            def stereo_mix(data):
+                frames = np.frombuffer(data, dtype=np.int16)
+                n = frames.size >> 1
+                # dtype pins the int32 loop so the sum can't wrap in int16
+                np.add(frames[0::2], frames[1::2], out=acc[:n], dtype=np.int32)
+                acc[:n] >>= 1
+                np.copyto(out[:n], acc[:n], casting="unsafe")
+                return out[:n].tobytes()
+            return stereo_mix
+
+        ch_idx = np.asarray(idx, dtype=np.intp)
+        n_sel = len(idx)
+
+        def generic_mix(data):
+            frames = np.frombuffer(data, dtype=np.int16).reshape(-1, n_ch)
+            n = frames.shape[0]
+            frames[:, ch_idx].sum(axis=1, dtype=np.int32, out=acc[:n])
+            acc[:n] //= n_sel
+            np.copyto(out[:n], acc[:n], casting="unsafe")
+            return out[:n].tobytes()
+        return generic_mix
+
+    @staticmethod
+    def _kernel_passthrough(data):
+        return data
+
+    # --- ITERATION ---
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if not self.active:
+            raise StopIteration
+        data = self.stream.read(self.chunk, exception_on_overflow=False)
+        return self._kernel(data)
+
+    def close(self):
+        self.active = False
+        try:
+            self.stream.stop_stream()
+            self.stream.close()
+            self.p.terminate()
+        except: pass
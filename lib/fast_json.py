@@ -0,0 +1,38 @@
+"""
+orjson-backed JSON helpers with a stdlib fallback.
+
+orjson encodes/parses in C (SIMD string escaping, native datetime) and is
+3-10x faster than stdlib json on the nested turn/word dicts this app moves
+around on every broadcast and save. It is optional: if it isn't installed,
+these helpers degrade to the stdlib with compact separators.
+
+All dump helpers return bytes (orjson's native output); decode at the call
+site when a str is required (e.g. websocket text frames).
+"""
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def dumps(obj) -> bytes:
+    """Compact JSON encode to bytes."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(',', ':')).encode()
+
+
+def dumps_pretty(obj) -> bytes:
+    """Indented JSON encode to bytes, for human-read artifacts."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, indent=2).encode()
+
+
+def loads(data):
+    """Parse JSON from bytes or str."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
@@ -2,13 +2,17 @@ import asyncio
 import json
 import logging
 import os
-import wave
+import queue
+import struct
 import time
 import signal
 import sys
 import threading
 import gc
-from datetime import datetime
+import hashlib
+import resource
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Any, cast, List, Optional, TypedDict, Dict
 
@@ -56,6 +60,7 @@ from dotenv import load_dotenv
 load_dotenv()
 
 import httpx
+import numpy as np
 import pyaudio
 import websockets
 from assemblyai.streaming.v3 import (
@@ -70,11 +75,11 @@ from assemblyai.streaming.v3 import (
 )
 
 # --- CONFIG & ANALYZERS (Lazy Loaded) ---
-from analyzers.llm_gateway import run_llm_gateway_query
-from upload_audio_aai import (
-    process_and_upload,
-    get_existing_students
-)
+from lib import fast_json
+# upload_audio_aai (and through it the whole analyzer/ingest chain) is
+# imported lazily at the two sites that need it — end-of-session only.
+# Importing it here made the websocket server pay seconds of NLP library
+# startup before it could accept a single connection.
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger("SemanticServer")
@@ -86,10 +91,14 @@ GITENGLISH_MCP_SECRET = os.getenv("MCP_SECRET")
 
 # --- TYPES ---
 class SessionTurn(TypedDict):
+    # In-memory turns are slim: full word-level data lives in the session
+    # JSONL log (written once per turn) and is only re-materialized at
+    # consolidation time. Holding list[dict] words for a whole session
+    # costs hundreds of bytes per word in dict overhead alone.
     turn_order: int
     transcript: str
     speaker: str
-    words: List[Dict[str, Any]]
+    word_count: int
     timestamp: str
 
 class SessionData(TypedDict):
@@ -100,6 +109,7 @@ class SessionData(TypedDict):
     file_path: Optional[str]
     notes: str
     audio_path: Optional[str]
+    audio_hash: Optional[str]
 
 # Global State
 connected_clients = set()
@@ -113,9 +123,56 @@ current_session: SessionData = {
     "turns": [],
     "file_path": None,
     "notes": "",
-    "audio_path": None 
+    "audio_path": None,
+    "audio_hash": None
 }
 
+# O(1) lookup companion to current_session["turns"]; entries reference the
+# same dicts as the list, so in-place updates keep both consistent.
+turns_by_order: Dict[int, SessionTurn] = {}
+
+# 8-byte content fingerprint per turn_order. AssemblyAI re-emits finished
+# turns with identical content; a cheap hash compare lets us skip the
+# log write and broadcast entirely for those.
+turn_fingerprints: Dict[int, bytes] = {}
+
+# Speaker label -> display name, frozen once per session so the per-turn
+# hot path is a single 2-entry dict lookup instead of config reads.
+_speaker_map: Dict[str, str] = {}
+
+def resolve_speaker_map(student_name: str) -> None:
+    """Freeze the label->name mapping for this session from config.json."""
+    tutor_name = "Aaron"
+    try:
+        with open("config.json", "rb") as f:
+            tutor_name = str(fast_json.loads(f.read()).get("speaker_name", tutor_name))
+    except Exception:
+        pass  # No config; heuristic default stands
+    _speaker_map.clear()
+    _speaker_map.update({"A": tutor_name, "B": student_name})
+
+# Incremental word counter — avoids walking every turn's word list when the
+# consolidated session JSON is written.
+session_total_words: int = 0
+
+# --- MEMORY MONITOR ---
+
+MEMORY_MONITOR_INTERVAL_S = 60.0
+
+async def monitor_memory():
+    """Log peak RSS periodically using a single getrusage syscall per tick.
+
+    Runs as a task on the main loop — no dedicated OS thread, no GIL
+    contention with the websocket server between ticks.
+    resource.getrusage reports ru_maxrss in KiB on Linux and bytes on macOS.
+    """
+    kib_scale = 1 if sys.platform == "darwin" else 1024
+    while True:
+        await asyncio.sleep(MEMORY_MONITOR_INTERVAL_S)
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        peak_mb = (usage.ru_maxrss * kib_scale) / (1024 * 1024)
+        logger.info(f"🧠 Peak memory: {peak_mb:.1f} MB")
+
 # --- RESOURCE CLEANUP ---
 
 def cleanup_resources():
@@ -143,97 +200,395 @@ def cleanup_resources():
     gc.collect()
     logger.info("✅ Memory garbage collection triggered")
 
-def signal_handler(sig, frame):
+def _on_signal():
     cleanup_resources()
     sys.exit(0)
 
-signal.signal(signal.SIGINT, signal_handler)
-signal.signal(signal.SIGTERM, signal_handler)
-atexit_registered = False
+# Signal handlers are installed by main() on the running loop
+# (loop.add_signal_handler is asyncio-safe, unlike signal.signal which
+# can fire mid-callback on the loop thread). Registering at import time
+# also made every importer of this module steal SIGINT/SIGTERM.
 import atexit
-if not atexit_registered:
-    atexit.register(cleanup_resources)
-    atexit_registered = True
+atexit.register(cleanup_resources)
 
 # --- STUDENT HUB (PURE BEDROCK) ---
 
+# Student list rarely changes; cache it in-process so reconnects don't
+# re-read and re-parse the profile file on the websocket hot path.
+_students_cache: Optional[List[str]] = None
+_students_cache_key: Optional[tuple] = None
+_students_lock = threading.Lock()
+
+def _students_sources_key() -> tuple:
+    """Freshness key for the student list: stat of the profile file and
+    the sessions dir. The dir mtime ticks whenever a session log is
+    created, so both sources invalidate without any TTL guesswork."""
+    def _stat(path: str):
+        try:
+            st = os.stat(path)
+            return (st.st_mtime_ns, st.st_size)
+        except OSError:
+            return None
+    return (_stat("student_profiles.json"), _stat("sessions"))
+
+# Serialized student_list frame, built lazily from the cached list so N
+# reconnecting clients share one json encode instead of paying one each.
+_students_payload: Optional[str] = None
+
+def add_student_to_cache(student_name: str) -> None:
+    """Mutate the cached list in place instead of invalidating it."""
+    global _students_cache, _students_payload
+    with _students_lock:
+        if _students_cache is not None and student_name not in _students_cache:
+            _students_cache = sorted([*_students_cache, student_name])
+            _students_payload = None
+
+def _students_from_session_logs() -> set[str]:
+    """Recover student names from past session logs without full parses.
+
+    Each session .jsonl starts with a one-line meta record, so we read just
+    that first line per file — bytes read scale with metadata size, not
+    with transcript size. os.scandir avoids a stat per entry.
+    """
+    students: set[str] = set()
+    try:
+        with os.scandir("sessions") as it:
+            for entry in it:
+                if not entry.name.endswith(".jsonl") or not entry.is_file():
+                    continue
+                try:
+                    with open(entry.path, "rb") as f:
+                        meta = fast_json.loads(f.readline())
+                    name = meta.get("student_name") if isinstance(meta, dict) else None
+                    if name and "Tutor" not in str(name):
+                        students.add(str(name))
+                except Exception:
+                    continue  # Corrupt/legacy log; skip it
+    except FileNotFoundError:
+        pass
+    return students
+
 async def get_existing_students() -> list[str]:
     """Instant load from local bedrock. No network overhead."""
+    global _students_cache, _students_cache_key
+    key = _students_sources_key()
+    with _students_lock:
+        if _students_cache is not None and key == _students_cache_key:
+            return _students_cache
+
     students = {"System Test Student"}
     try:
         p = Path("student_profiles.json")
         if p.exists():
-            with open(p, "r") as f:
-                data = json.load(f)
+            with open(p, "rb") as f:
+                data = fast_json.loads(f.read())
                 for s in data:
                     if s and "Tutor" not in str(s):
                         students.add(str(s))
             logger.info(f"📖 Bedrock: Loaded {len(students)} students")
     except Exception as e:
         logger.error(f"❌ Bedrock load failed: {e}")
-    
-    return sorted(list(students))
+
+    students |= _students_from_session_logs()
+
+    result = sorted(list(students))
+    with _students_lock:
+        global _students_payload
+        _students_cache, _students_cache_key = result, key
+        _students_payload = None
+    return result
+
+async def _student_list_payload() -> str:
+    """The student_list frame as already-encoded JSON text."""
+    global _students_payload
+    students = await get_existing_students()
+    with _students_lock:
+        if _students_payload is None:
+            _students_payload = fast_json.dumps(
+                {"message_type": "student_list", "students": students}
+            ).decode()
+        return _students_payload
+
+# --- SESSION PERSISTENCE ---
+# Turns are appended to a sidecar .jsonl as they arrive (O(1) per turn),
+# and the consolidated session JSON is only written once, at session end.
+# Rewriting the whole growing turns list on every event would be O(N^2)
+# over a long session.
+
+session_log_fp = None
+
+# Dedicated pool for persistence work. asyncio.to_thread uses the loop's
+# default executor, which is shared with DNS lookups and any other
+# run_in_executor work — a slow disk flush shouldn't queue behind those.
+_persist_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="persist")
+atexit.register(_persist_executor.shutdown)
+
+# The end-of-session handoff runs the tiered analyzers — seconds of pure
+# CPU Python that would hold this process's GIL and starve partial
+# broadcasts if run on a thread. A worker process gets its own GIL and
+# core. Lazy: forking a pool costs memory, and most process lifetimes
+# include zero or one handoff.
+_handoff_pool: Optional[ProcessPoolExecutor] = None
+
+def _get_handoff_pool() -> ProcessPoolExecutor:
+    global _handoff_pool
+    if _handoff_pool is None:
+        _handoff_pool = ProcessPoolExecutor(max_workers=1)
+        atexit.register(_handoff_pool.shutdown)
+    return _handoff_pool
+
+def open_session_log(student_name: str) -> None:
+    """Open the append-only JSONL log for this session (one line per turn)."""
+    global session_log_fp
+    os.makedirs("sessions", exist_ok=True)
+    path = f"sessions/session_{int(time.time())}.jsonl"
+    session_log_fp = open(path, "ab", buffering=1 << 16)
+    meta = {
+        "type": "meta",
+        "student_name": student_name,
+        "start_time": datetime.now().isoformat()
+    }
+    session_log_fp.write(fast_json.dumps(meta) + b"\n")
+    current_session["file_path"] = path
+    logger.info(f"📝 Session log opened: {path}")
+
+def append_turn_log(turn_data: Dict[str, Any]) -> None:
+    """Append one finished turn to the JSONL log. Bounded cost per turn."""
+    if session_log_fp:
+        try:
+            session_log_fp.write(fast_json.dumps(turn_data) + b"\n")
+        except Exception as e:
+            logger.error(f"❌ Turn log write failed: {e}")
+
+def _write_file_bytes(path: str, payload: bytes) -> None:
+    """Atomic write: tmp file + os.replace, no fsync on the hot path.
+
+    A crash mid-write leaves the old file (or just a stray .tmp), never a
+    truncated session JSON.
+    """
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(payload)
+    os.replace(tmp, path)
+
+def _consolidate_session_log(log_path: str, out_path: str, header: Dict[str, Any]) -> None:
+    """Rebuild full turns (with words) from the JSONL log and write the
+    consolidated JSON. Runs in a worker thread — the only place the full
+    word-level data is ever held in memory at once.
+    """
+    full_turns: Dict[int, Dict[str, Any]] = {}
+    with open(log_path, "rb") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                rec = fast_json.loads(line)
+            except Exception:
+                continue  # Truncated tail line from a crash; skip it
+            if not isinstance(rec, dict) or "turn_order" not in rec:
+                continue  # Meta record
+            # Re-emitted turns appear multiple times; last one wins.
+            full_turns[rec["turn_order"]] = rec
+
+    session_json = {**header, "turns": [full_turns[k] for k in sorted(full_turns)]}
+    _write_file_bytes(out_path, fast_json.dumps_pretty(session_json))
+
+async def save_session_to_file() -> None:
+    """Write the consolidated session JSON. Called at session end only.
+
+    The in-memory turns are word-free, so consolidation re-reads the JSONL
+    log in a worker thread and the websocket server keeps serving while the
+    blob is rebuilt and flushed.
+    """
+    global session_log_fp
+    if session_log_fp:
+        try: session_log_fp.close()
+        except: pass
+        session_log_fp = None
+
+    path = current_session.get("file_path")
+    if not path:
+        return
+    out_path = path[:-len(".jsonl")] + ".json" if path.endswith(".jsonl") else path + ".json"
+    header = {
+        "session_id": current_session.get("session_id"),
+        "student_name": current_session.get("student_name"),
+        "start_time": current_session.get("start_time"),
+        "notes": current_session.get("notes", ""),
+        "audio_path": current_session.get("audio_path"),
+        "total_turns": len(current_session.get("turns", [])),
+        "total_words": session_total_words,
+    }
+    try:
+        await asyncio.get_running_loop().run_in_executor(
+            _persist_executor, _consolidate_session_log, path, out_path, header
+        )
+        logger.info(f"💾 Session consolidated: {out_path}")
+    except Exception as e:
+        logger.error(f"❌ Session save failed: {e}")
 
 # --- WEBSOCKET HANDLER ---
-from analyzers.llm_gateway import push_to_semantic_server
-from analyzers.schemas import Turn
 
 # Global list of connected clients (websockets)
 connected_clients = set()
 
+def _fanout(payload: str) -> None:
+    """Fan a pre-serialized frame out to every client.
+
+    websockets.broadcast prepares the frame once and reuses it per socket,
+    never awaits, and skips clients whose write buffer is full — so one
+    serialization and zero extra copies per broadcast, and a slow client
+    sheds frames instead of stalling the producer.
+    """
+    if connected_clients:
+        websockets.broadcast(connected_clients, payload)
+
 async def broadcast_message(message):
     """
     Sends a JSON message to all connected WebSocket clients.
     """
     if connected_clients:
-        msg = json.dumps(message)
-        # Create tasks for all sends
-        tasks = [asyncio.create_task(client.send(msg)) for client in connected_clients]
-        # Wait for all to complete, ignoring errors
-        await asyncio.gather(*tasks, return_exceptions=True)
+        # Text frame: the UI does JSON.parse on event.data, so decode here.
+        _fanout(fast_json.dumps(message).decode())
+
+# Outbox drained by a single task on the main loop. Producers on the
+# transcription thread enqueue via queue_broadcast() instead of scheduling
+# one run_coroutine_threadsafe Future per event.
+broadcast_queue: Optional[asyncio.Queue] = None
 
+def queue_broadcast(message):
+    """Thread-safe enqueue of a broadcast; coalesced by _broadcast_drain.
+
+    Serialization happens here, on the producer (SDK) thread — the loop
+    thread only ever touches ready-to-send frames. The message type rides
+    along so the drain can still coalesce partials without re-parsing.
+    """
+    if main_loop and broadcast_queue is not None:
+        item = (message.get("message_type"), fast_json.dumps(message).decode())
+        main_loop.call_soon_threadsafe(broadcast_queue.put_nowait, item)
+
+async def _broadcast_drain():
+    """Drain the outbox in batches (~50ms ticks under load).
+
+    Rapid partial-transcript events are coalesced down to the latest one per
+    batch, so a burst of partials costs one wakeup and one send instead of N.
+    """
+    while True:
+        batch = [await broadcast_queue.get()]
+        while not broadcast_queue.empty():
+            batch.append(broadcast_queue.get_nowait())
+
+        if len(batch) > 1:
+            # Keep only the newest partial, at its original queue position.
+            # Partials precede their turn's final frame, so moving the
+            # survivor to the end would replay stale text over the final
+            # on the UI's live line.
+            last_partial = -1
+            for i, item in enumerate(batch):
+                if item[0] == "partial":
+                    last_partial = i
+            if last_partial != -1:
+                batch = [
+                    item for i, item in enumerate(batch)
+                    if item[0] != "partial" or i == last_partial
+                ]
+
+        for _kind, payload in batch:
+            _fanout(payload)
+
+
+async def _handle_get_students(websocket, data):
+    await websocket.send(await _student_list_payload())
+
+async def _handle_start_session(websocket, data):
+    global session_total_words, _stream_active
+    # Claim the stream before touching any state; only one streaming
+    # thread may exist (see _stream_lock by run_streaming_client).
+    with _stream_lock:
+        already_active = _stream_active
+        if not already_active:
+            _stream_active = True
+    if already_active:
+        logger.warning("⚠️ start_session ignored — a session is already streaming")
+        await websocket.send(fast_json.dumps(
+            {"message_type": "error", "error": "session_already_active"}
+        ).decode())
+        return
+    current_session["student_name"] = str(data.get("student_name", "Unknown"))
+    current_session["turns"] = []
+    current_session["audio_hash"] = None
+    turns_by_order.clear()
+    turn_fingerprints.clear()
+    session_total_words = 0
+    add_student_to_cache(current_session["student_name"])
+    resolve_speaker_map(current_session["student_name"])
+    open_session_log(current_session["student_name"])
+    logger.info(f"🚀 Starting session for: {current_session['student_name']}")
+    threading.Thread(target=run_streaming_client, daemon=True).start()
+
+async def _handle_end_session(websocket, data):
+    logger.info("🛑 Stop requested by UI")
+    # Stop capture first. close() flushes the writer, patches the WAV
+    # header and computes the audio hash — all of which must land before
+    # the handoff reads the file — and flips active off so the streaming
+    # thread's iterator ends, letting its finally release the
+    # single-flight latch for the next session. Runs off-loop: it joins
+    # the writer thread (seconds, worst case).
+    mgr = audio_stream_manager
+    if mgr is not None:
+        await asyncio.to_thread(mgr.close)
+    # O(1) summary — the counters are maintained incrementally per turn,
+    # so no pass over the turns list on the teardown path.
+    logger.info(
+        f"📊 Session summary: {len(current_session['turns'])} turns, "
+        f"{session_total_words} words for {current_session.get('student_name', 'Unknown')}"
+    )
+    await save_session_to_file()
+    # Trigger Handoff via Audio Pipeline if audio exists
+    audio_p = current_session.get("audio_path")
+    student = current_session.get("student_name", "Unknown")
+    notes = current_session.get("notes", "")
+
+    # stat off-loop: sessions/ may live on a slow or network disk, and
+    # every connected client shares this event loop.
+    if audio_p and await asyncio.to_thread(os.path.exists, audio_p):
+        logger.info(f"🚚 Initiating Full Handoff for {student} via {audio_p}...")
+        # Fire-and-forget into the handoff worker process: the tiered
+        # analyzers run under the child's GIL, so live broadcasts here
+        # never stutter. The audio hash was computed on the capture thread
+        # at stream close, so the pipeline skips re-reading the whole WAV
+        # when it's available.
+        from upload_audio_aai import run_handoff_sync
+        asyncio.get_running_loop().run_in_executor(
+            _get_handoff_pool(), run_handoff_sync,
+            audio_p, student, notes, current_session.get("audio_hash")
+        )
+    else:
+        logger.warning("⚠️ No audio file found for session handoff.")
+
+    # Termination handled via stream close in run_streaming_client
+
+# O(1) dispatch instead of a growing if/elif ladder of string compares.
+HANDLERS = {
+    "get_students": _handle_get_students,
+    "start_session": _handle_start_session,
+    "end_session": _handle_end_session,
+}
 
 async def websocket_handler(websocket):
     connected_clients.add(websocket)
     logger.info("🔌 UI Connected via WebSocket")
     try:
-        # Send initial list
-        students = await get_existing_students()
-        payload = {"message_type": "student_list", "students": students}
-        logger.info(f"📤 Sending student list to UI: {len(students)} names")
-        await websocket.send(json.dumps(payload))
-        
+        # Send initial list (shared pre-encoded payload)
+        logger.info("📤 Sending student list to UI")
+        await websocket.send(await _student_list_payload())
+
         async for message in websocket:
-            data = json.loads(message)
-            m_type = data.get("message_type")
-            
-            if m_type == "get_students":
-                students = await get_existing_students()
-                await websocket.send(json.dumps({"message_type": "student_list", "students": students}))
-            
-            elif m_type == "start_session":
-                current_session["student_name"] = str(data.get("student_name", "Unknown"))
-                current_session["turns"] = []
-                logger.info(f"🚀 Starting session for: {current_session['student_name']}")
-                threading.Thread(target=run_streaming_client, daemon=True).start()
-                
-            elif m_type == "end_session":
-                logger.info("🛑 Stop requested by UI")
-                # Trigger Handoff via Audio Pipeline if audio exists
-                audio_p = current_session.get("audio_path")
-                student = current_session.get("student_name", "Unknown")
-                notes = current_session.get("notes", "")
-
-                if audio_p and os.path.exists(audio_p):
-                    logger.info(f"🚚 Initiating Full Handoff for {student} via {audio_p}...")
-                    # Run async process in a thread to avoid blocking WS loop?
-                    # Actually, process_and_upload is async. We can schedule it on the loop.
-                    asyncio.create_task(process_and_upload(audio_p, student, notes))
-                else:
-                    logger.warning("⚠️ No audio file found for session handoff.")
-                
-                # Termination handled via stream close in run_streaming_client
-                
+            data = fast_json.loads(message)
+            handler = HANDLERS.get(data.get("message_type"))
+            if handler:
+                await handler(websocket, data)
+
     except websockets.exceptions.ConnectionClosed:
         pass
     finally:
@@ -242,83 +597,290 @@ async def websocket_handler(websocket):
 # --- AUDIO STREAMING ---
 
 class MonoMicrophoneStream:
+    # Chunks whose mean-square energy falls below this are treated as silence
+    # (roughly RMS < 100 on int16 samples — well under speech levels).
+    SILENCE_MS_THRESHOLD = 100 * 100
+    # Always send at least one chunk per second so AssemblyAI's VAD stays fed.
+    KEEPALIVE_INTERVAL_S = 1.0
+
     def __init__(self, device_index=7):
         self.p = pyaudio.PyAudio()
-        self.stream = self.p.open(
-            format=pyaudio.paInt16, 
-            channels=1, 
-            rate=16000, 
-            input=True, 
-            input_device_index=device_index, 
-            frames_per_buffer=8000
-        )
+        # Outbox for the AssemblyAI iterator; filled by the PortAudio
+        # callback thread, drained by __next__.
+        self._send_q: queue.Queue = queue.Queue(maxsize=16)
         self.audio_path = f"sessions/audio_{int(time.time())}.wav"
         os.makedirs("sessions", exist_ok=True)
-        self.wf = wave.open(self.audio_path, 'wb')
-        self.wf.setnchannels(1)
-        self.wf.setsampwidth(self.p.get_sample_size(pyaudio.paInt16))
-        self.wf.setframerate(16000)
+        # Raw-fd WAV writing: the wave module re-packs every writeframes
+        # call and recounts nframes; for a fixed mono/16k/16-bit stream the
+        # header is 44 known bytes, so we write a placeholder now, os.write
+        # raw PCM as it comes, and patch the two size fields on close.
+        self._fd = os.open(self.audio_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        os.write(self._fd, self._wav_header(0))
+        self._data_bytes = 0  # owned by the writer thread until join()
         current_session['audio_path'] = self.audio_path
         self.active = True
+        # close() is reachable from both the end_session handler and the
+        # streaming thread's finally; only the first caller tears down.
+        self._closed = False
+        self._close_lock = threading.Lock()
+        self._last_sent = time.monotonic()
+        # Disk writes happen on a dedicated thread so a slow flush never
+        # stalls the capture loop between PortAudio reads. Bounded queue:
+        # if the disk falls a full 32s behind, we'd rather block than grow.
+        self._write_q: queue.Queue = queue.Queue(maxsize=64)
+        self._writer_thread = threading.Thread(target=self._writer, daemon=True)
+        self._writer_thread.start()
+        # Callback mode: PortAudio's own thread hands us each buffer, so
+        # there's no blocking read() holding the GIL between chunks and the
+        # SDK iterator just drains a queue.
+        self.stream = self.p.open(
+            format=pyaudio.paInt16,
+            channels=1,
+            rate=16000,
+            input=True,
+            input_device_index=device_index,
+            frames_per_buffer=8000,
+            stream_callback=self._pa_callback
+        )
+
+    @staticmethod
+    def _wav_header(data_bytes: int) -> bytes:
+        """44-byte canonical PCM header for mono 16 kHz int16."""
+        return struct.pack(
+            "<4sI4s4sIHHIIHH4sI",
+            b"RIFF", 36 + data_bytes, b"WAVE",
+            b"fmt ", 16, 1, 1, 16000, 32000, 2, 16,
+            b"data", data_bytes,
+        )
+
+    def _pa_callback(self, in_data, frame_count, time_info, status):
+        """Runs on PortAudio's audio thread — must never block."""
+        try:
+            self._write_q.put_nowait(in_data)
+        except queue.Full:
+            logger.warning("⚠️ WAV writer behind; dropping a recorded chunk")
+
+        samples = np.frombuffer(in_data, dtype=np.int16).astype(np.int64)
+        # np.dot avoids allocating the squared array
+        mean_sq = int(np.dot(samples, samples) // max(len(samples), 1))
+        now = time.monotonic()
+        if mean_sq >= self.SILENCE_MS_THRESHOLD or (now - self._last_sent) >= self.KEEPALIVE_INTERVAL_S:
+            self._last_sent = now
+            try:
+                self._send_q.put_nowait(in_data)
+            except queue.Full:
+                # Ring semantics: evict the oldest chunk and keep the new
+                # one. If the uplink stalls, fresh audio is worth more than
+                # stale audio, and recency keeps the transcript current.
+                try:
+                    self._send_q.get_nowait()
+                except queue.Empty:
+                    pass
+                try:
+                    self._send_q.put_nowait(in_data)
+                except queue.Full:
+                    pass  # Lost the race with the sender; drop and move on
+        return (None, pyaudio.paContinue)
+
+    def _writer(self):
+        """Drain queued chunks, batching up to 8 per writeframes call."""
+        closing = False
+        while not closing:
+            batch = [self._write_q.get()]
+            while len(batch) < 8:
+                try:
+                    batch.append(self._write_q.get_nowait())
+                except queue.Empty:
+                    break
+            if None in batch:
+                closing = True
+                batch = [b for b in batch if b is not None]
+            if batch:
+                try:
+                    payload = b"".join(batch)
+                    os.write(self._fd, payload)
+                    self._data_bytes += len(payload)
+                except Exception as e:
+                    logger.error(f"❌ WAV write failed: {e}")
 
     def __iter__(self): return self
     def __next__(self):
-        if not self.active: raise StopIteration
-        data = self.stream.read(8000, exception_on_overflow=False)
-        self.wf.writeframes(data)
-        return data
+        # The local recording gets every frame via the callback — only the
+        # websocket payload is gated on silence, also in the callback.
+        while True:
+            if not self.active:
+                raise StopIteration
+            try:
+                return self._send_q.get(timeout=0.5)
+            except queue.Empty:
+                continue  # Silent stretch; poll active and keep waiting
 
     def close(self):
         self.active = False
+        with self._close_lock:
+            if self._closed:
+                return  # Already torn down by the other caller
+            self._closed = True
         try:
             self.stream.stop_stream()
             self.stream.close()
-            self.wf.close()
+        except: pass
+        # Flush pending frames before closing the wav (sentinel, then join).
+        try:
+            self._write_q.put(None)
+            self._writer_thread.join(timeout=10.0)
+        except Exception: pass
+        # Patch the RIFF/data sizes now that the PCM length is final, then
+        # release the fd. Safe to read _data_bytes: the writer has joined.
+        try:
+            os.lseek(self._fd, 0, os.SEEK_SET)
+            os.write(self._fd, self._wav_header(self._data_bytes))
+            os.close(self._fd)
+        except Exception as e:
+            logger.error(f"❌ WAV header patch failed: {e}")
+        try:
             self.p.terminate()
         except: pass
+        # Hash the finished WAV here, on the capture thread, so the handoff
+        # doesn't pay a full-file read later on the event loop's executor.
+        # (The header holds the sizes, so hashing must wait for the patch.)
+        try:
+            from upload_audio_aai import calculate_file_hash
+            current_session["audio_hash"] = calculate_file_hash(self.audio_path)
+        except Exception:
+            pass  # Handoff falls back to hashing the file itself
+
+# Wall-clock base captured once per session; per-turn timestamps are the
+# base plus a monotonic offset. Same ISO string shape, but turns can't go
+# backwards under NTP slew and we skip a gettimeofday per event.
+_t0_wall: datetime = datetime.now()
+_t0_mono: float = time.monotonic()
+
+def _turn_timestamp() -> str:
+    return (_t0_wall + timedelta(seconds=time.monotonic() - _t0_mono)).isoformat(timespec="milliseconds")
 
 def on_begin(self, event: BeginEvent):
+    global _t0_wall, _t0_mono
     logger.info(f"✅ AssemblyAI Session Started: {event.id}")
     current_session["session_id"] = event.id
-    current_session["start_time"] = datetime.now().isoformat()
-    if main_loop:
-        asyncio.run_coroutine_threadsafe(broadcast_message({"message_type": "session_start", "session_id": event.id}), main_loop)
+    _t0_wall = datetime.now()
+    _t0_mono = time.monotonic()
+    current_session["start_time"] = _t0_wall.isoformat()
+    queue_broadcast({"message_type": "session_start", "session_id": event.id})
+
+# Last partial text shipped to the UI; AssemblyAI re-emits identical
+# partials during silence, and those are pure wasted serialize+send.
+# Changed partials are additionally rate-limited: the UI repaints one
+# line, so anything faster than ~10 Hz is invisible churn. The final
+# transcript never goes through this gate and is never dropped.
+_last_partial_text: Optional[str] = None
+_last_partial_ts: float = 0.0
+PARTIAL_COOLDOWN_S = 0.1
 
 def on_turn(self, event: TurnEvent):
+    global _last_partial_text, _last_partial_ts
     if not getattr(event, "end_of_turn", False):
-        if main_loop:
-            asyncio.run_coroutine_threadsafe(broadcast_message({"message_type": "partial", "text": event.transcript}), main_loop)
+        if event.transcript == _last_partial_text:
+            return  # Unchanged partial; nothing new for the UI
+        now = time.monotonic()
+        if now - _last_partial_ts < PARTIAL_COOLDOWN_S:
+            return  # Within cooldown; the next partial supersedes this one
+        _last_partial_text = event.transcript
+        _last_partial_ts = now
+        queue_broadcast({"message_type": "partial", "text": event.transcript})
         return
-
-    turns_list = current_session.get("turns") or []
+    _last_partial_text = None
+    _last_partial_ts = 0.0
+
+    order = getattr(event, "turn_order", None)
+    if order is None:
+        order = len(current_session["turns"]) + 1
+
+    fp = hashlib.blake2b(event.transcript.encode(), digest_size=8).digest()
+    prior = turns_by_order.get(order)
+    if (
+        turn_fingerprints.get(order) == fp
+        and prior is not None
+        and prior.get("word_count") == len(event.words or ())
+    ):
+        return  # Identical re-emission; already logged and broadcast
+    turn_fingerprints[order] = fp
+
+    # Word timing goes out struct-of-arrays: four parallel lists instead of
+    # one dict per word. Per-word dicts repeat the four key strings in
+    # every JSON record, which roughly doubles the log/frame size; the
+    # viewer doesn't read words at all and nothing in-tree consumes the
+    # live log's word data row-wise, so columns are strictly cheaper.
+    ws = event.words or ()
+    words = {
+        "text": [w.text for w in ws],
+        "start": [w.start for w in ws],
+        "end": [w.end for w in ws],
+        # 4 decimals is already beyond ASR precision; full float repr
+        # ("0.8236578964352608") is 3x the JSON bytes for noise digits.
+        "confidence": [round(w.confidence, 4) for w in ws],
+    }
+    word_count = len(ws)
+    # Full word data goes to the JSONL log and the UI; memory keeps a slim
+    # record.
+    # Single-channel capture: everything we hear is heuristically the
+    # student ("B"). The frozen per-session map turns the label into a name.
+    detected = getattr(event, "speaker", None) or "B"
+    speaker = _speaker_map.get(detected, f"Speaker {detected}")
+    turn_record = {
+        "turn_order": order,
+        "transcript": event.transcript,
+        "speaker": speaker,
+        "words": words,
+        "timestamp": _turn_timestamp()
+    }
     turn_data: SessionTurn = {
-        "turn_order": len(turns_list) + 1,
+        "turn_order": order,
         "transcript": event.transcript,
-        "speaker": "Speaker B", # Heuristic for student
-        "words": [{"text": w.text, "start": w.start, "end": w.end, "confidence": w.confidence} for w in (event.words or [])],
-        "timestamp": datetime.now().isoformat()
+        "speaker": speaker,
+        "word_count": word_count,
+        "timestamp": turn_record["timestamp"],
     }
-    
-    # We defined turns as List[SessionTurn], so we can append directly
-    current_session["turns"].append(turn_data)
 
-    if main_loop:
-        asyncio.run_coroutine_threadsafe(broadcast_message({"message_type": "transcript", **turn_data}), main_loop)
+    global session_total_words
+    existing = turns_by_order.get(order)
+    if existing is not None:
+        # AssemblyAI re-emitted this turn: update the shared dict in place
+        # so the list entry stays consistent. No O(N) scan needed.
+        session_total_words -= existing.get("word_count", 0)
+        existing.update(turn_data)
+    else:
+        current_session["turns"].append(turn_data)
+        turns_by_order[order] = turn_data
+    session_total_words += word_count
+    append_turn_log(turn_record)
+
+    queue_broadcast({"message_type": "transcript", **turn_record})
 
 def on_error(self, error: StreamingError):
     logger.error(f"💥 AssemblyAI Error: {error}")
 
+# Single-flight guard: a double-clicked Start or a reconnecting UI must
+# not spawn a second streaming thread — two PyAudio streams on the same
+# device fight over PortAudio and clobber audio_stream_manager.
+_stream_lock = threading.Lock()
+_stream_active = False
+
 def run_streaming_client():
-    global audio_stream_manager
-    client = StreamingClient(StreamingClientOptions(api_key=api_key))
-    client.on(StreamingEvents.Begin, on_begin)
-    client.on(StreamingEvents.Turn, on_turn)
-    client.on(StreamingEvents.Error, on_error)
-    
-    client.connect(StreamingParameters(sample_rate=16000))
-    audio_stream_manager = MonoMicrophoneStream()
-    
+    global audio_stream_manager, _stream_active
+    # Everything from connect onward sits inside the try: a gateway/auth
+    # failure or a busy capture device must still release the
+    # single-flight latch, or no session could ever start again.
+    client = None
     try:
+        client = StreamingClient(StreamingClientOptions(api_key=api_key))
+        client.on(StreamingEvents.Begin, on_begin)
+        client.on(StreamingEvents.Turn, on_turn)
+        client.on(StreamingEvents.Error, on_error)
+
+        client.connect(StreamingParameters(sample_rate=16000))
+        audio_stream_manager = MonoMicrophoneStream()
+
         client.stream(audio_stream_manager)
     except Exception as e:
         logger.error(f"❌ Session Error: {e}")
@@ -327,12 +889,23 @@ def run_streaming_client():
         if audio_stream_manager:
             audio_stream_manager.close()
         logger.info("🔴 Session Closed.")
-        client.disconnect()
+        if client is not None:
+            try:
+                client.disconnect()
+            except Exception:
+                pass  # Never connected, or the gateway already hung up
         logger.info("🎬 Stream Closed")
+        with _stream_lock:
+            _stream_active = False
 
 async def main():
-    global main_loop
+    global main_loop, broadcast_queue
     main_loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        main_loop.add_signal_handler(sig, _on_signal)
+    broadcast_queue = asyncio.Queue()
+    asyncio.create_task(_broadcast_drain())
+    asyncio.create_task(monitor_memory())
     logger.info("🛰️ Semantic Server starting on port 8765...")
     async with websockets.serve(websocket_handler, "localhost", 8765):
         await asyncio.Future()
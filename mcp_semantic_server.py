@@ -1,11 +1,11 @@
 import asyncio
+import hashlib
 import os
-import json
 import logging
+from collections import OrderedDict
 import httpx
 from mcp.server.fastmcp import FastMCP
-from analyzers.schemas import Turn
-from analyzers.llm_gateway import generate_analysis
+from lib import fast_json
 
 # Initialize FastMCP server
 mcp = FastMCP("Semantic Analysis (Polyguru)")
@@ -14,67 +14,108 @@ mcp = FastMCP("Semantic Analysis (Polyguru)")
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("MCP-SemanticServer")
 
+# One pooled client for the life of the server, same pattern as the hub
+# client in upload_audio_aai: per-call AsyncClient construction pays a
+# fresh TCP handshake (and connection-pool setup) on every tool call.
+_analyze_client: httpx.AsyncClient | None = None
+
+def _get_analyze_client() -> httpx.AsyncClient:
+    global _analyze_client
+    if _analyze_client is None or _analyze_client.is_closed:
+        _analyze_client = httpx.AsyncClient(
+            # We assume semantic_server.py is running on port 8080 as per launch.sh
+            base_url="http://localhost:8080",
+            timeout=300.0,
+            limits=httpx.Limits(max_connections=5, max_keepalive_connections=2),
+        )
+    return _analyze_client
+
+# Both tools POST the identical payload to /analyze and differ only in
+# which slice of the response they return, and callers routinely follow
+# one with the other. Cache the full response per (student, transcript)
+# so the second tool call is a dict lookup instead of a repeat of the
+# heaviest request in the system (local suite + LLM).
+_ANALYSIS_CACHE: "OrderedDict[str, dict]" = OrderedDict()
+_ANALYSIS_CACHE_MAX = 64
+_analysis_cache_lock = asyncio.Lock()
+
+class _ServerError(Exception):
+    """Non-200 from the semantic server; message is the tool's reply."""
+
+async def _fetch_analysis(student_name: str, transcript_text: str) -> dict:
+    """POST to /analyze, LRU-cached on a digest of the inputs."""
+    key = hashlib.blake2b(
+        f"{student_name}\x00{transcript_text}".encode(), digest_size=16
+    ).hexdigest()
+    async with _analysis_cache_lock:
+        cached = _ANALYSIS_CACHE.get(key)
+        if cached is not None:
+            _ANALYSIS_CACHE.move_to_end(key)
+            return cached
+
+    # We can either duplicate the logic from semantic_server.py
+    # OR better, just call its local endpoint if it's running.
+    # To keep it truly "One Source of Truth", we call the FastAPI app.
+    response = await _get_analyze_client().post(
+        "/analyze",
+        json={
+            "student_name": student_name,
+            "transcript_text": transcript_text,
+            "turns": [] # Minimal for now
+        }
+    )
+    if response.status_code != 200:
+        raise _ServerError(f"Error from Semantic Server: {response.status_code} - {response.text}")
+
+    result = response.json()
+    async with _analysis_cache_lock:
+        _ANALYSIS_CACHE[key] = result
+        _ANALYSIS_CACHE.move_to_end(key)
+        while len(_ANALYSIS_CACHE) > _ANALYSIS_CACHE_MAX:
+            _ANALYSIS_CACHE.popitem(last=False)
+    return result
+
 @mcp.tool()
 async def analyze_transcript(student_name: str, transcript_text: str) -> str:
     """
     Analyzes an ESL tutoring transcript using the Polyguru suite.
     Combines deterministic linguistic rules with LLM reasoning.
+    Returns compact JSON (machine-to-machine; pipe through a formatter
+    if you need it human-readable).
     """
     logger.info(f"🧠 MCP Analysis requested for: {student_name}")
-    
-    # We can either duplicate the logic from semantic_server.py 
-    # OR better, just call its local endpoint if it's running.
-    # To keep it truly "One Source of Truth", we call the FastAPI app.
-    
-    async with httpx.AsyncClient(timeout=300.0) as client:
-        try:
-            # We assume semantic_server.py is running on port 8080 as per launch.sh
-            response = await client.post(
-                "http://localhost:8080/analyze",
-                json={
-                    "student_name": student_name,
-                    "transcript_text": transcript_text,
-                    "turns": [] # Minimal for now
-                }
-            )
-            if response.status_code == 200:
-                result = response.json()
-                # Return the LLM analysis part primarily
-                return json.dumps(result.get("llm_analysis", {}), indent=2)
-            else:
-                return f"Error from Semantic Server: {response.status_code} - {response.text}"
-        except Exception as e:
-            return f"Failed to connect to Semantic Server: {str(e)}"
+    try:
+        result = await _fetch_analysis(student_name, transcript_text)
+        # Return the LLM analysis part primarily
+        return fast_json.dumps(result.get("llm_analysis", {})).decode()
+    except _ServerError as e:
+        return str(e)
+    except Exception as e:
+        return f"Failed to connect to Semantic Server: {str(e)}"
 
 @mcp.tool()
 async def get_analysis_handoff(student_name: str, transcript_text: str) -> str:
     """
     Retrieves the COMPLETE analysis data handoff for a session.
     Includes raw metrics, lexical stats, chunks, and LLM analysis.
-    Returns the full, unfiltered JSON object.
+    Returns the full, unfiltered JSON object as compact JSON.
     Use this for data export, debugging, or full-fidelity downstream processing.
     """
     logger.info(f"🤝 Data Handoff requested for: {student_name}")
-    
-    async with httpx.AsyncClient(timeout=300.0) as client:
-        try:
-            # Call the same internal endpoint but request the full payload return
-            response = await client.post(
-                "http://localhost:8080/analyze",
-                json={
-                    "student_name": student_name,
-                    "transcript_text": transcript_text,
-                    "turns": [] # Minimal, assuming raw text is primary for this dump mode
-                }
-            )
-            if response.status_code == 200:
-                result = response.json()
-                # [High-Fidelity] Return the ENTIRE object
-                return json.dumps(result, indent=2)
-            else:
-                return f"Error from Semantic Server: {response.status_code} - {response.text}"
-        except Exception as e:
-            return f"Failed to connect to Semantic Server: {str(e)}"
+    try:
+        result = await _fetch_analysis(student_name, transcript_text)
+        # [High-Fidelity] Return the ENTIRE object
+        return fast_json.dumps(result).decode()
+    except _ServerError as e:
+        return str(e)
+    except Exception as e:
+        return f"Failed to connect to Semantic Server: {str(e)}"
+
+# The card is a small static file but this tool gets hammered during
+# agent discovery; read it once and serve from memory. An edited card
+# is picked up via a cheap mtime check rather than a re-read per call.
+_agent_card: str | None = None
+_agent_card_mtime: int | None = None
 
 @mcp.tool()
 async def get_agent_card() -> str:
@@ -82,13 +123,18 @@ async def get_agent_card() -> str:
     Retrieves the A2A Agent Card for this server.
     Describes capabilities, skills, and interfaces.
     """
+    global _agent_card, _agent_card_mtime
     logger.info(f"🆔 Agent Card requested.")
     card_path = os.path.join(os.path.dirname(__file__), "agent_card.json")
-    if os.path.exists(card_path):
+    try:
+        mtime = os.stat(card_path).st_mtime_ns
+    except OSError:
+        return fast_json.dumps({"error": "Agent Card not found."}).decode()
+    if _agent_card is None or mtime != _agent_card_mtime:
         with open(card_path, "r") as f:
-            return f.read()
-    else:
-        return json.dumps({"error": "Agent Card not found."})
+            _agent_card = f.read()
+        _agent_card_mtime = mtime
+    return _agent_card
 
 if __name__ == "__main__":
     mcp.run()
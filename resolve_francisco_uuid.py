@@ -21,7 +21,8 @@ if not url or not key:
 
 supabase: Client = create_client(url, key)
 
-response = supabase.table("students").select("*").eq("username", "Francisco").execute()
+# Only the id is used below; don't pull every column over the wire.
+response = supabase.table("students").select("id").eq("username", "Francisco").execute()
 
 if response.data:
     student = response.data[0]
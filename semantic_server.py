@@ -1,5 +1,6 @@
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
+import asyncio
 import os
 import logging
 import json
@@ -12,6 +13,36 @@ logger = logging.getLogger("SemanticServer")
 
 app = FastAPI(title="Semantic Server (MiniGuru)", version="2.0.0")
 
+# Stateless analyzers, built once per process on first use. Constructing
+# these per request reloads pattern files / vocab each time; only
+# SessionAnalyzer is per-request state (it's bound to one session's turns).
+_analyzer_cache: dict[str, object] = {}
+
+def _cached_analyzer(name: str, factory):
+    inst = _analyzer_cache.get(name)
+    if inst is None:
+        inst = _analyzer_cache[name] = factory()
+    return inst
+
+async def _none_result():
+    """Placeholder awaitable so optional analyzers slot into one gather."""
+    return None
+
+# Default system prompt, read once. It's also the byte-stable prefix of
+# every gateway call, which is what provider-side prompt caching keys on
+# — so it must not be rebuilt or reordered per request.
+_default_system_prompt: str | None = None
+
+def _get_default_system_prompt() -> str:
+    global _default_system_prompt
+    if _default_system_prompt is None:
+        try:
+            with open("UNIVERSAL_GURU_PROMPT.txt", "r") as f:
+                _default_system_prompt = f.read()
+        except FileNotFoundError:
+            _default_system_prompt = "You are an expert ESL linguistic analyst."
+    return _default_system_prompt
+
 class AnalysisRequest(BaseModel):
     student_name: str
     transcript_text: str
@@ -55,40 +86,61 @@ async def analyze_session(request: AnalysisRequest):
         student_text = core_analyzer.student_full_text
 
         # 1.2 Phenomena Matcher (Static Patterns)
-        from analyzers.phenomena_matcher import ErrorPhenomenonMatcher
-        matcher = ErrorPhenomenonMatcher()
-        await matcher.initialize()
-        local_insights["phenomena"] = matcher.match(student_text)
+        matcher = _analyzer_cache.get("phenomena")
+        if matcher is None:
+            from analyzers.phenomena_matcher import ErrorPhenomenonMatcher
+            matcher = ErrorPhenomenonMatcher()
+            await matcher.initialize()
+            _analyzer_cache["phenomena"] = matcher
 
         # 1.3 Fluency Analysis (Timing/Hesitation)
         from analyzers.fluency_analyzer import FluencyAnalyzer
-        fluency = FluencyAnalyzer()
+        fluency = _cached_analyzer("fluency", FluencyAnalyzer)
         # Extract word timing from turns if available
         # This assumes Turns provided in request have word-level data
         all_words = []
         for turn in request.turns:
             if hasattr(turn, 'words') and turn.words:
                 all_words.extend([w.dict() if hasattr(w, 'dict') else w for w in turn.words])
-        if all_words:
-            local_insights["fluency"] = fluency.analyze_hesitation(all_words)
 
-        # 1.4 Register & Genre (Amalgum)
         from analyzers.amalgum_analyzer import AmalgumAnalyzer
-        amalgum = AmalgumAnalyzer()
-        local_insights["register"] = {
-            "scores": amalgum.analyze_register(student_text),
-            "classification": amalgum.get_genre_classification(student_text)
-        }
-
-        # 1.5 Granular Grammar Checks
         from analyzers.article_analyzer import ArticleAnalyzer
         from analyzers.preposition_analyzer import PrepositionAnalyzer
         from analyzers.learner_error_analyzer import LearnerErrorAnalyzer
-        
+        amalgum = _cached_analyzer("amalgum", AmalgumAnalyzer)
+
+        # 1.2-1.5 all consume only student_text / all_words, so they fan out
+        # to worker threads and run while each other's C/regex layers hold
+        # no GIL; wall time is the slowest analyzer, not the sum.
+        (
+            phenomena,
+            register_scores,
+            genre,
+            articles_res,
+            prepositions_res,
+            learner_errors_res,
+            fluency_res,
+        ) = await asyncio.gather(
+            asyncio.to_thread(matcher.match, student_text),
+            asyncio.to_thread(amalgum.analyze_register, student_text),
+            asyncio.to_thread(amalgum.get_genre_classification, student_text),
+            asyncio.to_thread(_cached_analyzer("articles", ArticleAnalyzer).analyze, student_text),
+            asyncio.to_thread(_cached_analyzer("prepositions", PrepositionAnalyzer).analyze, student_text),
+            asyncio.to_thread(_cached_analyzer("learner_errors", LearnerErrorAnalyzer).analyze, student_text),
+            asyncio.to_thread(fluency.analyze_hesitation, all_words) if all_words else _none_result(),
+        )
+
+        local_insights["phenomena"] = phenomena
+        if fluency_res is not None:
+            local_insights["fluency"] = fluency_res
+        local_insights["register"] = {
+            "scores": register_scores,
+            "classification": genre
+        }
         local_insights["grammar_checks"] = {
-            "articles": ArticleAnalyzer().analyze(student_text),
-            "prepositions": PrepositionAnalyzer().analyze(student_text),
-            "learner_errors": LearnerErrorAnalyzer().analyze(student_text)
+            "articles": articles_res,
+            "prepositions": prepositions_res,
+            "learner_errors": learner_errors_res
         }
 
         logger.info(f"✅ Local Suite Complete. Register: {local_insights['register']['classification']}")
@@ -100,8 +152,15 @@ async def analyze_session(request: AnalysisRequest):
     # --- 2. LLM GATEWAY (The Reasoning Layer) ---
     logger.info("🦅 Calling LLM Gateway with Grounded Context...")
     
-    # Construct High-Fidelity Context for LLM
+    # Construct High-Fidelity Context for LLM. Static instructions lead,
+    # volatile per-session content trails: together with the cached system
+    # prompt this keeps the longest possible byte-identical prefix across
+    # calls, which is what provider prompt caches match on.
     user_message = f"""
+INSTRUCTIONS:
+Combine the local linguistic data with your own deep reasoning to generate a definitive post-lesson report.
+Ensure you cross-reference the 'phenomena' found by the local matcher.
+
 SESSION ANALYSIS REQUEST: {request.student_name}
 
 [LAYER 1: RAW TRANSCRIPT]
@@ -114,20 +173,10 @@ SESSION ANALYSIS REQUEST: {request.student_name}
 - Specific Patterns: {', '.join([p['item'] for p in local_insights.get('phenomena', [])[:5]]) if local_insights.get('phenomena') else 'None detected by rule-base'}
 
 [DETAILED LOCAL METRICS]
-{json.dumps(local_insights, indent=2, default=str)}
-
-INSTRUCTIONS: 
-Combine the local linguistic data with your own deep reasoning to generate a definitive post-lesson report.
-Ensure you cross-reference the 'phenomena' found by the local matcher.
+{json.dumps(local_insights, indent=2, sort_keys=True, default=str)}
 """
 
-    system_prompt = request.system_prompt
-    if not system_prompt:
-        try:
-            with open("UNIVERSAL_GURU_PROMPT.txt", "r") as f:
-                system_prompt = f.read()
-        except FileNotFoundError:
-            system_prompt = "You are an expert ESL linguistic analyst."
+    system_prompt = request.system_prompt or _get_default_system_prompt()
 
     try:
         llm_result = await generate_analysis(
@@ -48,9 +48,16 @@ class TestPreSession(unittest.IsolatedAsyncioTestCase):
 
     def test_calculate_file_hash(self):
         with patch("builtins.open", mock_open(read_data=b"test data")) as mock_file:
-            # md5("test data") = eb733a00c0c9d336e65691a37ab54293
             result = calculate_file_hash("dummy.txt")
-            self.assertEqual(result, "eb733a00c0c9d336e65691a37ab54293")
+
+        # Match whichever backend is available (blake3 preferred, sha256 fallback)
+        try:
+            from blake3 import blake3
+            expected = blake3(b"test data").hexdigest()
+        except ImportError:
+            import hashlib
+            expected = hashlib.sha256(b"test data").hexdigest()
+        self.assertEqual(result, expected)
 
     def test_calculate_file_hash_error(self):
          with patch("builtins.open", side_effect=Exception("File not found")):
@@ -5,10 +5,16 @@ import os
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+import validation
 from validation import validate_audio_device
 
 class TestValidation(unittest.TestCase):
 
+    def setUp(self):
+        # validate_audio_device caches the device snapshot after the first
+        # enumeration; reset it so each test enumerates via its own mock.
+        validation._DEVICES = None
+
     @patch('pyaudio.PyAudio')
     def test_valid_device(self, mock_pyaudio):
         """Test that a valid audio device is correctly identified."""
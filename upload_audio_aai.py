@@ -6,6 +6,7 @@ import asyncio
 import uuid
 import logging
 import hashlib
+import mmap
 import sys
 import shutil
 from datetime import datetime, timedelta
@@ -33,6 +34,7 @@ import httpx # type: ignore
 import asyncio
 from AssemblyAIv2.analyzers.sentence_chunker import chunk_transcript
 from AssemblyAIv2.analyzers.lexical_engine import LexicalEngine
+from AssemblyAIv2.lib import fast_json
 from AssemblyAIv2.run_local_analysis import run_tiered_analysis
 
 # --- Setup Logging ---
@@ -85,48 +87,94 @@ class SessionTurn(TypedDict):
 
 # --- Helper Functions ---
 
+# BLAKE3 hashes with AVX2/NEON kernels (~3-10x MD5 throughput on audio
+# files); SHA-256 is the stdlib fallback and hardware-accelerated on
+# CPUs with SHA extensions.
+try:
+    from blake3 import blake3 as _blake3  # type: ignore
+except ImportError:
+    _blake3 = None
+
+# 1 MiB chunks amortize the Python loop and give the SIMD kernels long runs.
+_HASH_CHUNK_SIZE = 1 << 20
+
 def calculate_file_hash(file_path: str | Path) -> str | None:
-    hash_md5 = hashlib.md5()
+    hasher = _blake3() if _blake3 is not None else hashlib.sha256()
     try:
         with open(file_path, "rb") as f:
-            for chunk in iter(lambda: f.read(4096), b""):
-                hash_md5.update(chunk)
-        return hash_md5.hexdigest()
+            try:
+                # Zero-copy fast path: hand the kernel-mapped file to the
+                # hash C routine in a single update, no Python chunk loop.
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    hasher.update(mm)
+                return hasher.hexdigest()
+            except (ValueError, OSError, TypeError):
+                # Empty file or mmap unavailable (pipes, mocks): chunked read.
+                for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b""):
+                    hasher.update(chunk)
+        return hasher.hexdigest()
     except Exception as e:
         logger.error(f"Error hashing {file_path}: {e}")
         return None
 
+# Built once at import; these are placeholder/system labels, not students.
+_SYSTEMIC_FILTERS: frozenset[str] = frozenset({"Test", "Unknown", "null", "Tutor", "Aaron (Tutor)", "Speaker"})
+_SESSION_PREFIX = "Session_"
+
 def get_existing_students() -> list[str]:
     """Load students from local cache (student_profiles.json)."""
     students: set[str] = set()
     try:
         if os.path.exists("student_profiles.json"):
-            with open("student_profiles.json", "r") as f:
-                local_data = json.load(f)
+            with open("student_profiles.json", "rb") as f:
+                local_data = fast_json.loads(f.read())
                 if isinstance(local_data, list):
-                    for item in local_data:
-                        if item: students.add(item)
+                    students.update(item for item in local_data if item)
     except Exception as e:
         logger.error(f"Failed to load local student cache: {e}")
 
-    systemic_filters = {"Test", "Unknown", "null", None, "Tutor", "Aaron (Tutor)", "Speaker"}
-    cleaned = {s for s in students if s and s not in systemic_filters and not s.startswith("Session_")}
-    return sorted(list(cleaned))
+    return sorted(s for s in students if s not in _SYSTEMIC_FILTERS and not s.startswith(_SESSION_PREFIX))
+
+# --- Shared HTTP clients ---
+# One pooled client per destination for the life of the process. Opening a
+# fresh AsyncClient per call costs a TCP + TLS handshake every time; the
+# hub calls (checkHash, createSession) happen back-to-back and reuse the
+# same keep-alive connection this way.
+_hub_client: httpx.AsyncClient | None = None
+_local_client: httpx.AsyncClient | None = None
+
+def _get_hub_client() -> httpx.AsyncClient:
+    global _hub_client
+    if _hub_client is None or _hub_client.is_closed:
+        _hub_client = httpx.AsyncClient(
+            timeout=60.0,
+            verify=False,
+            limits=httpx.Limits(max_connections=10, max_keepalive_connections=5),
+        )
+    return _hub_client
+
+def _get_local_client() -> httpx.AsyncClient:
+    global _local_client
+    if _local_client is None or _local_client.is_closed:
+        _local_client = httpx.AsyncClient(
+            timeout=300.0,
+            limits=httpx.Limits(max_connections=5, max_keepalive_connections=2),
+        )
+    return _local_client
 
 async def send_to_gitenglish(action: str, student_id_or_name: str, params: Mapping[str, object] | None = None) -> Mapping[str, object]:
     if not GITENGLISH_MCP_SECRET:
         # logger.error("❌ MCP_SECRET not set") # Removed to reduce noise if intentional
         return {"success": False, "error": "MCP_SECRET missing"}
-    
+
     url = f"{GITENGLISH_API_BASE}/api/mcp"
     # GitEnglishHub expects: Authorization: Bearer <MCP_SECRET>
     headers = {"Authorization": f"Bearer {GITENGLISH_MCP_SECRET}", "Content-Type": "application/json"}
     payload = {"action": action, "studentId": student_id_or_name, "params": params or {}}
-    
+
     try:
-        async with httpx.AsyncClient(timeout=60.0, verify=False) as client:
-            response = await client.post(url, headers=headers, json=payload)
-            return response.json() if response.status_code == 200 else {"success": False, "error": response.text}
+        response = await _get_hub_client().post(url, headers=headers, json=payload)
+        return response.json() if response.status_code == 200 else {"success": False, "error": response.text}
     except Exception as e:
         return {"success": False, "error": str(e)}
 
@@ -181,46 +229,50 @@ async def generate_llm_analysis(
     }
     
     try:
-        async with httpx.AsyncClient(timeout=300.0) as client:
-            response = await client.post(url, json=payload)
-            if response.status_code == 200:
-                result = response.json()
-                llm_res = result.get("llm_analysis", {})
-                
-                # Adapt Semantic Server response to local expected format
-                return {
-                    "termination": {"reason": "success"},
-                    "response": llm_res.get("session_summary", "Analysis Complete"),
-                    "annotated_errors": llm_res.get("language_feedback", []),
-                    "student_profile": {"boss_notes": llm_res.get("boss_notes", "")},
-                    "raw_output": result
-                }
-            else:
-                logger.error(f"❌ Semantic Server Error: {response.status_code}")
-                return {"error": f"Semantic Server Error {response.status_code}"}
-                
+        response = await _get_local_client().post(url, json=payload)
+        if response.status_code == 200:
+            result = response.json()
+            llm_res = result.get("llm_analysis", {})
+
+            # Adapt Semantic Server response to local expected format
+            return {
+                "termination": {"reason": "success"},
+                "response": llm_res.get("session_summary", "Analysis Complete"),
+                "annotated_errors": llm_res.get("language_feedback", []),
+                "student_profile": {"boss_notes": llm_res.get("boss_notes", "")},
+                "raw_output": result
+            }
+        else:
+            logger.error(f"❌ Semantic Server Error: {response.status_code}")
+            return {"error": f"Semantic Server Error {response.status_code}"}
+
     except Exception as e:
         logger.error(f"💥 Failed to reach Semantic Server: {e}")
         return {"error": str(e)}
 
-async def perform_batch_diarization(audio_path: str, student_name: str) -> Mapping[str, object] | None:
+async def perform_batch_diarization(audio_path: str, student_name: str, file_hash: str | None = None) -> Mapping[str, object] | None:
     """
     High-Definition Batch Diarization (DUAL-PASS PROTOCOL).
     Pass 1: Get Speaker Labels (Requires Punctuation).
     Pass 2: Get Raw Text (No Punctuation).
     Merge: Align Speaker Labels to Raw Words.
+
+    file_hash may be passed in by the caller to avoid re-hashing the audio.
     """
     logger.info(f"🎙️ Starting Dual-Pass Diarization for {audio_path}...")
-    
+
     # --- CACHE CHECK (God-Tier Efficiency) ---
-    file_hash = calculate_file_hash(audio_path)
+    if file_hash is None:
+        file_hash = calculate_file_hash(audio_path)
     cache_path = WORKSPACE_ROOT / "AssemblyAIv2/ingestion_cache.json"
     cache_data: dict[str, object] = {} # type: ignore
     
     if cache_path.exists():
         try:
-            with open(cache_path, "r") as f:
-                cache_data = cast(dict[str, object], json.load(f))
+            # The cache holds full transcripts per hash — multi-MB once a few
+            # sessions accumulate, so parse it with the C parser.
+            with open(cache_path, "rb") as f:
+                cache_data = cast(dict[str, object], fast_json.loads(f.read()))
         except Exception as e:
             logger.warning(f"Failed to load cache: {e}")
 
@@ -315,6 +367,14 @@ async def perform_batch_diarization(audio_path: str, student_name: str) -> Mappi
         
         # Sort diar_map by start time for efficient searching (though words should be sorted already)
         diar_map.sort(key=lambda x: float(x['start']))
+
+        # Hoist the per-entry conversions out of the merge loop: the scan
+        # below may touch each diarized span several times per raw word, and
+        # float()/str() on dict values each visit adds up over thousands of
+        # words. Plain tuples also unpack cheaper than keyed dict access.
+        diar_spans: list[tuple[float, float, str]] = [
+            (float(d['start']), float(d['end']), str(d['speaker'])) for d in diar_map
+        ]
         
         # Build Final Turns
         # We will reconstruct turns based on SPEAKER CHANGES in the merged stream.
@@ -335,9 +395,9 @@ async def perform_batch_diarization(audio_path: str, student_name: str) -> Mappi
 
             # Search for an overlapping speaker tag
             temp_idx = diar_idx
-            while temp_idx < len(diar_map):
-                d = diar_map[temp_idx]
-                d_start, d_end = float(d['start']), float(d['end'])
+            n_spans = len(diar_spans)
+            while temp_idx < n_spans:
+                d_start, d_end, d_speaker = diar_spans[temp_idx]
 
                 # Advance if diarization is behind
                 if d_end < w_start:
@@ -348,9 +408,9 @@ async def perform_batch_diarization(audio_path: str, student_name: str) -> Mappi
                 # Break if diarization is too far ahead
                 if d_start > w_end:
                     break
-                
+
                 # Overlap found
-                found_speaker = str(d['speaker'])
+                found_speaker = d_speaker
                 break
             
             # --- Fallback Logic ---
@@ -453,13 +513,13 @@ async def perform_batch_diarization(audio_path: str, student_name: str) -> Mappi
                 # Reload cache in case of parallel writes (simple race condition handling)
                 current_cache = {}
                 if cache_path.exists():
-                     with open(cache_path, "r") as f:
-                        current_cache = json.load(f)
-                
+                     with open(cache_path, "rb") as f:
+                        current_cache = fast_json.loads(f.read())
+
                 current_cache[file_hash] = result
-                
-                with open(cache_path, "w") as f:
-                    json.dump(current_cache, f, indent=2)
+
+                with open(cache_path, "wb") as f:
+                    f.write(fast_json.dumps_pretty(current_cache))
                 logger.info(f"💾 Saved result to cache for {file_hash[:8]}")
             except Exception as e:
                 logger.warning(f"Failed to write cache: {e}")
@@ -472,9 +532,15 @@ async def perform_batch_diarization(audio_path: str, student_name: str) -> Mappi
         logger.error(traceback.format_exc())
         return None
 
-async def process_and_upload(audio_path: str, student_name: str, notes: str = "", transcript_id: str | None = None) -> Mapping[str, object]:
+async def process_and_upload(audio_path: str, student_name: str, notes: str = "", transcript_id: str | None = None, file_hash: str | None = None) -> Mapping[str, object]:
     logger.info(f"🚀 Batch Ingest: {audio_path if audio_path else 'Existing ID'} for {student_name}")
-    
+
+    # Hash once per ingest; the same digest serves the diarization cache
+    # check, the LLM cache writes, and the hub payload below. Callers that
+    # hashed the audio while capturing it can pass the digest in.
+    if file_hash is None and audio_path:
+        file_hash = calculate_file_hash(audio_path)
+
     diar_result = None
     if transcript_id:
         logger.info(f"🔗 Using existing Transcript ID: {transcript_id}")
@@ -510,7 +576,7 @@ async def process_and_upload(audio_path: str, student_name: str, notes: str = ""
             return {"success": False, "error": "transcript_fetch_failed"}
     else:
         # 1. Diarize via audio file
-        diar_result = await perform_batch_diarization(audio_path, student_name)
+        diar_result = await perform_batch_diarization(audio_path, student_name, file_hash=file_hash)
     
     if not diar_result:
         logger.error("❌ Processing failed.")
@@ -541,12 +607,25 @@ async def process_and_upload(audio_path: str, student_name: str, notes: str = ""
                 if 'speaker' in w:
                      w['speaker'] = speaker_remap.get(w['speaker'], w['speaker'])
 
-    # 2. Local Analysis (Tiered Suite)
-    # Refactored to separate module per architecture guidelines
+    # 2. Local Analysis (Tiered Suite) + LLM Analysis, concurrently.
+    # The tiered suite is CPU-bound Python and the LLM call is pure network
+    # wait; neither consumes the other's output (the semantic server builds
+    # its own local insights from the transcript), so wall time is
+    # max(tiered, llm) instead of their sum.
+    # The capture retention purge is a directory walk + rmtree, pure disk
+    # I/O with no dependency on anything below — kick it off now so it
+    # overlaps the analysis/LLM phase instead of sitting on the critical
+    # path right before the artifact save.
+    captures_root = WORKSPACE_ROOT / "AssemblyAIv2/.session_captures"
+    purge_task = asyncio.create_task(
+        asyncio.to_thread(purge_old_captures, captures_root, retention_days=7)
+    )
+
     # Passing "all 4 transcripts" (Turns, Sentences, Punctuated, Raw)
-    analysis_context = run_tiered_analysis(
-        student_name=student_name, 
-        all_turns=cast(list[dict[str, Any]], all_turns), 
+    tiered_task = asyncio.to_thread(
+        run_tiered_analysis,
+        student_name=student_name,
+        all_turns=cast(list[dict[str, Any]], all_turns),
         notes=notes,
         sentences=diar_result.get("sentences"),
         punctuated_text=diar_result.get("punctuated_text"),
@@ -556,94 +635,78 @@ async def process_and_upload(audio_path: str, student_name: str, notes: str = ""
     # 3. LLM_ANALYSIS (Gemini 3 Flash Preview)
     transcript_full = "\n".join([f"{t['speaker']}: {t['transcript']}" for t in all_turns])
     llm_analysis = diar_result.get('llm_analysis')
-    
+
     if llm_analysis:
         logger.info("⚡ LLM CACHE HIT! Reusing existing analysis...")
+        analysis_context = await tiered_task
     else:
         logger.info("🦅 Generating LLM via AssemblyAI (Gemini 3 Flash Preview)...")
-        
-        llm_analysis = await generate_llm_analysis(
-            student_name=student_name,
-            transcript_text=transcript_full,
-            user_notes=notes,
-            analysis_context=analysis_context
+
+        analysis_context, llm_analysis = await asyncio.gather(
+            tiered_task,
+            generate_llm_analysis(
+                student_name=student_name,
+                transcript_text=transcript_full,
+                user_notes=notes,
+                analysis_context={}  # Not consumed by the semantic server handoff
+            )
         )
-        
-        # Save LLM result to cache
-        file_hash = calculate_file_hash(audio_path)
+
+        # Save LLM result to cache so the next run of this hash skips the LLM.
+        # (A second, identical cache write used to run just below — same
+        # condition, same payload — doubling the multi-MB read+rewrite.)
         if file_hash:
             cache_path = WORKSPACE_ROOT / "AssemblyAIv2/ingestion_cache.json"
             try:
                 current_cache = {}
                 if cache_path.exists():
-                    with open(cache_path, "r") as f:
-                        current_cache = json.load(f)
-                
+                    with open(cache_path, "rb") as f:
+                        current_cache = fast_json.loads(f.read())
+
                 if file_hash in current_cache:
                     current_cache[file_hash]['llm_analysis'] = llm_analysis
-                    with open(cache_path, "w") as f:
-                        json.dump(current_cache, f, indent=2)
+                    with open(cache_path, "wb") as f:
+                        f.write(fast_json.dumps_pretty(current_cache))
                     logger.info(f"💾 LLM Analysis cached for {file_hash[:8]}")
             except: pass
 
     # 4. Final Handoff to Hub API
-    # ... [error_phenomena logic] ...
-    
-    # [NEW] SAVE TO CACHE BEFORE HANDOFF (Include AI Result)
-    if diar_result and not diar_result.get('llm_analysis'):
-        # Update the original diar_result with the AI analysis so the cache write at the end of diarization captures it
-        # Actually, diarization happens before this. We need to manually update the cache file now.
-        file_hash = calculate_file_hash(audio_path)
-        if file_hash:
-            cache_path = WORKSPACE_ROOT / "AssemblyAIv2/ingestion_cache.json"
-            try:
-                current_cache = {}
-                if cache_path.exists():
-                    with open(cache_path, "r") as f:
-                        current_cache = json.load(f)
-                
-                if file_hash in current_cache:
-                    current_cache[file_hash]['llm_analysis'] = llm_analysis
-                    with open(cache_path, "w") as f:
-                        json.dump(current_cache, f, indent=2)
-                    logger.info(f"💾 AI Analysis cached for {file_hash[:8]}")
-            except: pass
-    error_phenomena = []
-    if isinstance(llm_analysis, dict):
-        annotated_errors = llm_analysis.get('annotated_errors', [])
-        if isinstance(annotated_errors, list):
-            for err in annotated_errors:
-                if isinstance(err, dict):
-                    error_phenomena.append({
-                        "item": err.get('specificPhenomenon') or err.get('quote'), # Map specificPhenomenon to item
-                        "correction": err.get('suggestedCorrection') or err.get('correction'),
-                        "category": err.get('category', 'Syntax'),
-                        "explanation": err.get('explanation'),
-                        "source": f"AI_{err.get('source_weight', 'AUTO')}"
-                    })
-    
-    # Extract detected errors from the analysis context
-    detected_errors = analysis_context.get('detected_errors', [])
-    for err in detected_errors:
-        if isinstance(err, dict):
-            error_phenomena.append({
-                "item": err.get('text'), 
-                "category": "Grammar", 
-                "explanation": f"Detected {err.get('error_type')}", 
-                "source": "RULE_BASED"
-            })
+    annotated_errors = llm_analysis.get('annotated_errors', []) if isinstance(llm_analysis, dict) else []
+    if not isinstance(annotated_errors, list):
+        annotated_errors = []
+    # Comprehensions build both lists in one shot (no repeated append
+    # dispatch), then a single + fuses them into the payload list.
+    error_phenomena = [
+        {
+            "item": err.get('specificPhenomenon') or err.get('quote'), # Map specificPhenomenon to item
+            "correction": err.get('suggestedCorrection') or err.get('correction'),
+            "category": err.get('category', 'Syntax'),
+            "explanation": err.get('explanation'),
+            "source": f"AI_{err.get('source_weight', 'AUTO')}"
+        }
+        for err in annotated_errors if isinstance(err, dict)
+    ] + [
+        {
+            "item": err.get('text'),
+            "category": "Grammar",
+            "explanation": f"Detected {err.get('error_type')}",
+            "source": "RULE_BASED"
+        }
+        for err in analysis_context.get('detected_errors', []) if isinstance(err, dict)
+    ]
 
 
 
     # [NEW] PERSISTENCE LAYER: Save local artifacts as requested
     # Changed to hidden directory .session_captures per user request
-    captures_root = WORKSPACE_ROOT / "AssemblyAIv2/.session_captures"
     capture_dir = captures_root / student_name / datetime.now().strftime("%Y-%m-%d")
     capture_dir.mkdir(parents=True, exist_ok=True)
-    
-    # Run retention policy before saving new data
+
+    # Retention purge was started before the analysis phase; settle it
+    # before writing new data (it only ever removes out-of-window dates,
+    # never today's directory).
     try:
-        purge_old_captures(captures_root, retention_days=7)
+        await purge_task
     except Exception as e:
         logger.warning(f"⚠️ Retention purge failed (non-blocking): {e}")
 
@@ -673,7 +736,7 @@ async def process_and_upload(audio_path: str, student_name: str, notes: str = ""
         'pettyLlmAnalysis': llm_analysis,
         'pettyLocalAnalysis': analysis_context,
         'notes': notes,
-        'fileHash': calculate_file_hash(audio_path),
+        'fileHash': file_hash,
         # Enhanced Metadata Pass-through
         'assemblyai_raw_response': diar_result.get("raw_response_diar"),
         'assemblyai_content_response': diar_result.get("raw_response_raw")
@@ -688,15 +751,15 @@ async def process_and_upload(audio_path: str, student_name: str, notes: str = ""
         words_data = params.get('turns', [])
         if not words_data:
             logger.warning("   ⚠️ No 'turns' data found for _words.json. File will be empty.")
-        with open(capture_dir / f"{base_filename}_words.json", "w") as f:
-            json.dump(words_data, f, indent=2)
+        with open(capture_dir / f"{base_filename}_words.json", "wb") as f:
+            f.write(fast_json.dumps_pretty(words_data))
 
         # 2. _sentences.json
         sentences_data = params.get('sentences', [])
         if not sentences_data:
             logger.warning("   ⚠️ No 'sentences' data found for _sentences.json. File will be empty.")
-        with open(capture_dir / f"{base_filename}_sentences.json", "w") as f:
-            json.dump(sentences_data, f, indent=2)
+        with open(capture_dir / f"{base_filename}_sentences.json", "wb") as f:
+            f.write(fast_json.dumps_pretty(sentences_data))
 
         # 3. _raw.txt
         raw_text_data = params.get('transcriptText', "")
@@ -713,12 +776,12 @@ async def process_and_upload(audio_path: str, student_name: str, notes: str = ""
             f.write(diarized_text_data)
 
         # 5. _petty_analysis.json (Local Analysis Metrics)
-        with open(capture_dir / f"{base_filename}_petty_analysis.json", "w") as f:
-            json.dump(analysis_context, f, indent=2)
+        with open(capture_dir / f"{base_filename}_petty_analysis.json", "wb") as f:
+            f.write(fast_json.dumps_pretty(analysis_context))
 
         # 6. _petty_llm_analysis.json (Raw LLM Response)
-        with open(capture_dir / f"{base_filename}_petty_llm_analysis.json", "w") as f:
-            json.dump(llm_analysis, f, indent=2)
+        with open(capture_dir / f"{base_filename}_petty_llm_analysis.json", "wb") as f:
+            f.write(fast_json.dumps_pretty(llm_analysis))
 
         logger.info(f"💾 Saved local capture artifacts to {capture_dir}")
     except Exception as e:
@@ -742,6 +805,16 @@ async def process_and_upload(audio_path: str, student_name: str, notes: str = ""
 
     return result
 
+def run_handoff_sync(audio_path: str, student_name: str, notes: str = "", file_hash: str | None = None) -> Mapping[str, object]:
+    """Synchronous handoff entry point for worker processes.
+
+    Must stay a module-level function so ProcessPoolExecutor can import it
+    in the child under both fork and spawn start methods. The child gets
+    its own event loop and its own GIL, so the tiered analyzers can't
+    stall the live websocket loop in the parent.
+    """
+    return asyncio.run(process_and_upload(audio_path, student_name, notes, file_hash=file_hash))
+
 async def main():
     print("\n" + "="*60)
     print("🎧 BATCH AUDIO INGESTION TOOL")
@@ -0,0 +1,41 @@
+"""
+Audio device validation backed by a cached PortAudio snapshot.
+
+Enumerating devices re-queries the audio backend (CoreAudio/ALSA), which
+can take hundreds of milliseconds — so we do it once, lazily, and serve
+validations as list lookups. Call refresh_devices() after plugging or
+unplugging hardware.
+"""
+
+import logging
+from typing import Any, Optional
+
+import pyaudio
+
+logger = logging.getLogger("Validation")
+
+_DEVICES: Optional[list[dict[str, Any]]] = None
+
+
+def refresh_devices() -> list[dict[str, Any]]:
+    """Re-enumerate audio devices and replace the cached snapshot."""
+    global _DEVICES
+    p = pyaudio.PyAudio()
+    try:
+        _DEVICES = [p.get_device_info_by_index(i) for i in range(p.get_device_count())]
+    finally:
+        p.terminate()
+    return _DEVICES
+
+
+def validate_audio_device(device_index: int) -> bool:
+    """Check that device_index exists and can capture audio.
+
+    Uses the cached snapshot (populated on first call), so repeated
+    validations don't touch PortAudio at all.
+    """
+    devices = _DEVICES if _DEVICES is not None else refresh_devices()
+    if not 0 <= device_index < len(devices):
+        logger.warning(f"⚠️ Audio device index {device_index} out of range (have {len(devices)})")
+        return False
+    return int(devices[device_index].get("maxInputChannels", 0)) > 0